@@ -3,7 +3,289 @@
 Custom class-based context manager for Database connection
 """
 
+import logging
 import sqlite3
+import threading
+import time
+
+
+# Named PRAGMA sets applied to a connection right after it is opened
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # Negative values are KiB, so ~64MB
+        'mmap_size': 268435456,  # 256MB of memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # Milliseconds
+    },
+}
+
+# PRAGMA names accepted as overrides: everything the profiles set, plus a few
+# other documented connection settings. SQLite silently ignores unknown
+# pragmas, so a misspelt override would otherwise be a no-op.
+ALLOWED_PRAGMAS = frozenset(
+    name for settings in SQLITE_PROFILES.values() for name in settings
+) | {
+    'auto_vacuum', 'automatic_index', 'cache_spill', 'foreign_keys',
+    'journal_size_limit', 'locking_mode', 'page_size', 'query_only',
+    'threads', 'wal_autocheckpoint',
+}
+
+
+def apply_sqlite_profile(connection, profile='default', **pragmas):
+    """
+    Apply a named SQLITE_PROFILES entry, plus any PRAGMA overrides.
+
+    Args:
+        connection (sqlite3.Connection): The freshly opened connection
+        profile (str): Key into SQLITE_PROFILES
+        **pragmas: Extra PRAGMA values, e.g. cache_size=-128000
+
+    Returns:
+        sqlite3.Connection: The same connection
+
+    Raises:
+        ValueError: If an override is not in ALLOWED_PRAGMAS
+    """
+    unknown = sorted(set(pragmas) - ALLOWED_PRAGMAS)
+    if unknown:
+        raise ValueError(f"Unknown SQLite PRAGMA: {', '.join(unknown)}")
+    settings = dict(SQLITE_PROFILES[profile], **pragmas)
+    for name, value in settings.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+class LoggingSink:
+    """
+    Metrics sink that logs each block's metrics dict.
+    Formatting is skipped entirely when the level is disabled.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        """
+        Args:
+            logger (logging.Logger): Logger to write to (defaults to this module's)
+            level (int): Logging level for the metric records
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, metrics):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "database metrics: %s", metrics)
+
+
+class HistogramSink:
+    """
+    In-memory metrics sink keeping, for every *_time metric, a count, total,
+    maximum and a histogram with power-of-two microsecond buckets.
+    """
+
+    def __init__(self):
+        self.metrics = {}  # metric name -> [count, total, max, {bucket: count}]
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics):
+        with self._lock:
+            for name, value in metrics.items():
+                if not name.endswith('_time'):
+                    continue
+                stats = self.metrics.get(name)
+                if stats is None:
+                    stats = self.metrics[name] = [0, 0.0, 0.0, {}]
+                stats[0] += 1
+                stats[1] += value
+                stats[2] = max(stats[2], value)
+                # Smallest power of two (in microseconds) above the value
+                bucket = 1 << int(value * 1e6).bit_length()
+                stats[3][bucket] = stats[3].get(bucket, 0) + 1
+
+    def summary(self):
+        """
+        Summarize the recorded metrics.
+
+        Returns:
+            dict: Metric name -> count, mean, max (seconds) and buckets
+            ({upper bound in microseconds: count})
+        """
+        with self._lock:
+            return {
+                name: {
+                    'count': count,
+                    'mean': total / count,
+                    'max': maximum,
+                    'buckets': dict(sorted(buckets.items())),
+                }
+                for name, (count, total, maximum, buckets) in self.metrics.items()
+            }
+
+
+class ConnectionPool:
+    """
+    A bounded pool of long-lived sqlite3 connections to one database.
+    A thread that checks out a connection while already holding one gets
+    the same connection back, so nested blocks share one transaction.
+    """
+
+    def __init__(self, database_name, max_size=5, timeout=None, profile='default', **pragmas):
+        """
+        Initialize the pool; connections are opened lazily.
+
+        Args:
+            database_name (str): The name/path of the database file
+            max_size (int): Maximum number of open connections
+            timeout (float): Seconds acquire() waits before raising, None to wait forever
+            profile (str): SQLITE_PROFILES entry applied to new connections
+            **pragmas: PRAGMA overrides on top of the profile
+        """
+        self.database_name = database_name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.profile = profile
+        self.pragmas = pragmas
+        self._idle = []
+        self._created_at = {}  # id(connection) -> creation time
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.discarded = 0
+
+    def acquire(self, timeout=None):
+        """
+        Take a connection from the pool, opening one if below max_size.
+
+        Returns:
+            sqlite3.Connection: A connection owned by the caller until release()
+
+        Raises:
+            TimeoutError: If no connection frees up within the timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._condition:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if not self._idle and len(self._created_at) >= self.max_size:
+                self.waits += 1
+                started = time.monotonic()
+                available = self._condition.wait_for(
+                    lambda: self._closed or self._idle or len(self._created_at) < self.max_size,
+                    timeout
+                )
+                self.wait_time += time.monotonic() - started
+                if not available:
+                    raise TimeoutError(f"No connection to {self.database_name} available after {timeout}s")
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+            self.checkouts += 1
+            if self._idle:
+                return self._idle.pop()
+            # Reserve the slot before connecting outside the lock
+            placeholder = object()
+            self._created_at[id(placeholder)] = time.monotonic()
+
+        connection = None
+        try:
+            connection = sqlite3.connect(self.database_name, check_same_thread=False)
+            apply_sqlite_profile(connection, self.profile, **self.pragmas)
+        except BaseException:
+            if connection is not None:
+                connection.close()
+            with self._condition:
+                del self._created_at[id(placeholder)]
+                self._condition.notify()
+            raise
+        with self._condition:
+            del self._created_at[id(placeholder)]
+            self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def release(self, connection):
+        """Return a healthy connection to the pool."""
+        with self._condition:
+            if self._closed:
+                self._created_at.pop(id(connection), None)
+                connection.close()
+                self._condition.notify()
+                return
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Close a broken connection and free its slot for a new one."""
+        with self._condition:
+            self._created_at.pop(id(connection), None)
+            self.discarded += 1
+            self._condition.notify()
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def checkout(self):
+        """
+        Acquire a connection for this thread, reusing the one it already holds.
+
+        Returns:
+            tuple: (connection, True if this is the outermost checkout)
+        """
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            held[1] += 1
+            return held[0], False
+        connection = self.acquire()
+        self._local.held = [connection, 1]
+        return connection, True
+
+    def checkin(self, connection, broken=False):
+        """Undo one checkout(); the outermost one releases or discards the connection."""
+        held = self._local.held
+        held[1] -= 1
+        if held[1]:
+            return
+        self._local.held = None
+        if broken:
+            self.discard(connection)
+        else:
+            self.release(connection)
+
+    def stats(self):
+        """
+        Report pool usage.
+
+        Returns:
+            dict: Sizes, checkout/wait counters and the oldest connection age
+        """
+        with self._condition:
+            now = time.monotonic()
+            ages = [now - created for created in self._created_at.values()]
+            return {
+                'max_size': self.max_size,
+                'open': len(self._created_at),
+                'idle': len(self._idle),
+                'in_use': len(self._created_at) - len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'discarded': self.discarded,
+                'oldest_age': max(ages, default=0.0),
+            }
+
+    def close(self):
+        """Close idle connections; busy ones are closed when released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for connection in idle:
+                self._created_at.pop(id(connection), None)
+            self._condition.notify_all()
+        for connection in idle:
+            connection.close()
 
 
 class DatabaseConnection:
@@ -12,16 +294,30 @@ class DatabaseConnection:
     Automatically manages opening and closing database connections.
     """
     
-    def __init__(self, database_name):
+    def __init__(self, database_name=None, profile='default', pool=None, metrics_sink=None, **pragmas):
         """
         Initialize the DatabaseConnection with a database name.
         
         Args:
             database_name (str): The name/path of the database file
+            profile (str): SQLITE_PROFILES entry applied on connect
+            pool (ConnectionPool): Check connections out of this pool instead
+                of opening one; nested blocks on a thread share it, each
+                inside its own savepoint
+            metrics_sink (callable): Called on exit with the block's metrics
+                (connect_time, body_time, commit_time or rollback_time)
+            **pragmas: PRAGMA overrides on top of the profile
         """
-        self.database_name = database_name
+        self.database_name = database_name if pool is None else pool.database_name
+        self.pool = pool
+        self.outermost = True
+        self.metrics_sink = metrics_sink
+        self.metrics = {}
+        self.profile = profile
+        self.pragmas = pragmas
         self.connection = None
         self.cursor = None
+        self.savepoint = None
     
     def __enter__(self):
         """
@@ -31,13 +327,40 @@ class DatabaseConnection:
             sqlite3.Cursor: The database cursor for executing queries
         """
         try:
-            self.connection = sqlite3.connect(self.database_name)
+            started = time.perf_counter()
+            if self.pool is not None:
+                self.connection, self.outermost = self.pool.checkout()
+                if not self.outermost:
+                    self._begin_savepoint()
+            else:
+                self.connection = sqlite3.connect(self.database_name)
+                try:
+                    apply_sqlite_profile(self.connection, self.profile, **self.pragmas)
+                except BaseException:
+                    self.connection.close()
+                    self.connection = None
+                    raise
             self.cursor = self.connection.cursor()
+            self._entered_at = time.perf_counter()
+            self.metrics = {'database': self.database_name, 'connect_time': self._entered_at - started}
             return self.cursor
         except sqlite3.Error as e:
             print(f"Error connecting to database: {e}")
             raise
     
+    def _begin_savepoint(self):
+        """Open a savepoint so a nested block can roll back just its own work."""
+        try:
+            # A savepoint outside a transaction would start one that its
+            # RELEASE commits, so make sure the outer transaction exists
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN")
+            self.savepoint = f"nested_{id(self)}"
+            self.connection.execute(f"SAVEPOINT {self.savepoint}")
+        except sqlite3.Error:
+            self.pool.checkin(self.connection)
+            raise
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         Exit the context manager - close database connection.
@@ -47,16 +370,48 @@ class DatabaseConnection:
             exc_val: Exception value if an exception occurred
             exc_tb: Exception traceback if an exception occurred
         """
+        started = time.perf_counter()
+        if self.connection:
+            self.metrics['body_time'] = started - self._entered_at
         if self.cursor:
             self.cursor.close()
-        if self.connection:
-            if exc_type is None:
-                # No exception occurred, commit any pending transactions
-                self.connection.commit()
-            else:
-                # Exception occurred, rollback any pending transactions
-                self.connection.rollback()
-            self.connection.close()
+        outcome = 'commit_time' if exc_type is None else 'rollback_time'
+        try:
+            if self.connection and self.pool is not None:
+                # Nested blocks leave the shared transaction to the outermost
+                # one and only undo their own savepoint
+                if not self.outermost:
+                    try:
+                        if exc_type is not None:
+                            self.connection.execute(f"ROLLBACK TO {self.savepoint}")
+                        self.connection.execute(f"RELEASE {self.savepoint}")
+                    except sqlite3.Error:
+                        self.pool.checkin(self.connection)
+                        raise
+                    self.metrics[outcome] = time.perf_counter() - started
+                else:
+                    try:
+                        if exc_type is None:
+                            self.connection.commit()
+                        else:
+                            self.connection.rollback()
+                    except sqlite3.Error:
+                        self.pool.checkin(self.connection, broken=True)
+                        raise
+                    self.metrics[outcome] = time.perf_counter() - started
+                self.pool.checkin(self.connection)
+            elif self.connection:
+                if exc_type is None:
+                    # No exception occurred, commit any pending transactions
+                    self.connection.commit()
+                else:
+                    # Exception occurred, rollback any pending transactions
+                    self.connection.rollback()
+                self.metrics[outcome] = time.perf_counter() - started
+                self.connection.close()
+        finally:
+            if self.metrics_sink is not None and self.metrics:
+                self.metrics_sink(self.metrics)
         
         # Return False to propagate any exceptions
         return False
@@ -4,6 +4,24 @@ Reusable Query Context Manager
 """
 
 import sqlite3
+import time
+from array import array
+from itertools import islice
+
+
+def _column_typecode(values):
+    """
+    Pick an array typecode for a chunk of column values.
+    
+    Returns:
+        str: 'q' for INTEGER values, 'd' for REAL (or mixed numeric) values,
+        or None when the column has to stay a plain list
+    """
+    if all(type(value) is int for value in values):
+        return 'q'
+    if all(type(value) in (int, float) for value in values):
+        return 'd'
+    return None
 
 
 class ExecuteQuery:
@@ -12,7 +30,8 @@ class ExecuteQuery:
     managing both connection and query execution.
     """
     
-    def __init__(self, database_name, query, parameters=None):
+    def __init__(self, database_name, query, parameters=None, stream=False, arraysize=1000,
+                 bulk=False, chunk_size=1000, metrics_sink=None, columnar=False):
         """
         Initialize the ExecuteQuery context manager.
         
@@ -20,10 +39,28 @@ class ExecuteQuery:
             database_name (str): The name/path of the database file
             query (str): The SQL query to execute
             parameters (tuple): Parameters for the SQL query (optional)
+            stream (bool): Yield SELECT rows lazily instead of fetching them all
+            arraysize (int): Rows fetched per round trip when streaming
+            bulk (bool): Treat parameters as an iterable of parameter tuples
+                and run them through executemany in one transaction
+            chunk_size (int): Parameter tuples passed to each executemany call
+            metrics_sink (callable): Called on exit with the block's metrics
+                (connect_time, query_time, rows, body_time, commit_time or
+                rollback_time, plus rows_per_second for a committed bulk
+                load), e.g. a HistogramSink from 0-databaseconnection
+            columnar (bool): Return SELECT results as {column: values},
+                filling typed arrays while fetching arraysize rows at a time
         """
         self.database_name = database_name
         self.query = query
         self.parameters = parameters or ()
+        self.stream = stream
+        self.arraysize = arraysize
+        self.bulk = bulk
+        self.chunk_size = chunk_size
+        self.metrics_sink = metrics_sink
+        self.columnar = columnar
+        self.metrics = {}
         self.connection = None
         self.cursor = None
         self.results = None
@@ -33,11 +70,26 @@ class ExecuteQuery:
         Enter the context manager - establish connection and execute query.
         
         Returns:
-            list: The results of the executed query
+            list: The results of the executed query, or an iterator over
+            them in streaming mode (valid until the block exits); in bulk
+            mode a dict with rows_affected, seconds and rows_per_second,
+            updated on exit to include the commit;
+            in columnar mode a dict of column name -> values
         """
         try:
+            started = time.perf_counter()
             self.connection = sqlite3.connect(self.database_name)
             self.cursor = self.connection.cursor()
+            connected = time.perf_counter()
+            self.metrics = {'database': self.database_name, 'sql': self.query,
+                            'connect_time': connected - started}
+            
+            if self.bulk:
+                self.results = self._execute_bulk()
+                self.metrics['rows'] = self.results['rows_affected']
+                self._entered_at = time.perf_counter()
+                self.metrics['query_time'] = self._entered_at - connected
+                return self.results
             
             # Execute the query with parameters
             if self.parameters:
@@ -47,15 +99,137 @@ class ExecuteQuery:
             
             # Fetch results for SELECT queries
             if self.query.strip().upper().startswith('SELECT'):
-                self.results = self.cursor.fetchall()
+                if self.stream:
+                    self.cursor.arraysize = self.arraysize
+                    self.metrics['rows'] = 0  # Counted as the rows are streamed
+                    self.results = self._iter_rows()
+                elif self.columnar:
+                    self.results = self._fetch_columns()
+                    self.metrics['rows'] = len(next(iter(self.results.values()), ()))
+                else:
+                    self.results = self.cursor.fetchall()
+                    self.metrics['rows'] = len(self.results)
             else:
                 self.results = self.cursor.rowcount
+                self.metrics['rows'] = self.results
             
+            self._entered_at = time.perf_counter()
+            self.metrics['query_time'] = self._entered_at - connected
             return self.results
         
         except sqlite3.Error as e:
             print(f"Database error: {e}")
+            self._close_failed_enter()
             raise
+        except BaseException:
+            # e.g. the caller's bulk parameter generator failing partway
+            self._close_failed_enter()
+            raise
+    
+    def _close_failed_enter(self):
+        """
+        __exit__ does not run when __enter__ raises, so roll back whatever
+        was written and close the cursor and connection here.
+        """
+        if self.cursor:
+            self.cursor.close()
+            self.cursor = None
+        if self.connection:
+            try:
+                self.connection.rollback()
+            finally:
+                self.connection.close()
+                self.connection = None
+    
+    def _execute_bulk(self):
+        """
+        Run executemany over the parameter tuples in chunks of chunk_size.
+        The chunks share one transaction, committed or rolled back on exit.
+        Until then seconds and rows_per_second cover the executemany calls
+        only; __exit__ adds commit_seconds and folds it into both.
+        
+        Returns:
+            dict: rows_affected, execute_seconds, seconds and rows_per_second
+        """
+        parameters = iter(self.parameters)
+        rows_affected = 0
+        start = time.perf_counter()
+        while True:
+            chunk = list(islice(parameters, self.chunk_size))
+            if not chunk:
+                break
+            self.cursor.executemany(self.query, chunk)
+            rows_affected += self.cursor.rowcount
+        seconds = time.perf_counter() - start
+        return {
+            'rows_affected': rows_affected,
+            'execute_seconds': seconds,
+            'seconds': seconds,
+            'rows_per_second': rows_affected / seconds if seconds else 0.0,
+        }
+    
+    def _fetch_columns(self):
+        """
+        Fetch the result straight into per-column buffers. INTEGER columns
+        become array('q') and REAL columns array('d'), both of which
+        numpy.frombuffer() can wrap without copying; other columns (text,
+        NULLs, blobs) are lists. A column is widened if a later chunk
+        no longer fits its type.
+        
+        Returns:
+            dict: Column name -> array or list of values
+        """
+        names = [description[0] for description in self.cursor.description]
+        columns = None
+        while True:
+            rows = self.cursor.fetchmany(self.arraysize)
+            if not rows:
+                break
+            chunk = list(zip(*rows))
+            if columns is None:
+                columns = []
+                for values in chunk:
+                    typecode = _column_typecode(values)
+                    columns.append(array(typecode) if typecode else [])
+            for i, values in enumerate(chunk):
+                column = columns[i]
+                if isinstance(column, list):
+                    column.extend(values)
+                    continue
+                try:
+                    column.extend(array(column.typecode, values))
+                except (TypeError, OverflowError):
+                    if column.typecode == 'q' and _column_typecode(values) == 'd':
+                        columns[i] = array('d', column)
+                        columns[i].extend(array('d', values))
+                    else:
+                        columns[i] = list(column)
+                        columns[i].extend(values)
+        if columns is None:
+            columns = [[] for _ in names]
+        return dict(zip(names, columns))
+    
+    def _iter_rows(self):
+        """
+        Yield rows from the open cursor, fetching arraysize rows at a time.
+        
+        Yields:
+            tuple: One result row
+        """
+        while True:
+            rows = self.cursor.fetchmany()
+            if not rows:
+                return
+            self.metrics['rows'] += len(rows)
+            yield from rows
+    
+    def _record_bulk_commit(self, commit_seconds):
+        """Fold the commit into the bulk results, as the rows only land then."""
+        seconds = self.results['execute_seconds'] + commit_seconds
+        self.results['commit_seconds'] = commit_seconds
+        self.results['seconds'] = seconds
+        self.results['rows_per_second'] = self.results['rows_affected'] / seconds if seconds else 0.0
+        self.metrics['rows_per_second'] = self.results['rows_per_second']
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
@@ -66,16 +240,26 @@ class ExecuteQuery:
             exc_val: Exception value if an exception occurred
             exc_tb: Exception traceback if an exception occurred
         """
+        started = time.perf_counter()
         if self.cursor:
             self.cursor.close()
-        if self.connection:
-            if exc_type is None:
-                # No exception occurred, commit any pending transactions
-                self.connection.commit()
-            else:
-                # Exception occurred, rollback any pending transactions
-                self.connection.rollback()
-            self.connection.close()
+        try:
+            if self.connection:
+                self.metrics['body_time'] = started - self._entered_at
+                if exc_type is None:
+                    # No exception occurred, commit any pending transactions
+                    self.connection.commit()
+                    self.metrics['commit_time'] = time.perf_counter() - started
+                    if self.bulk:
+                        self._record_bulk_commit(self.metrics['commit_time'])
+                else:
+                    # Exception occurred, rollback any pending transactions
+                    self.connection.rollback()
+                    self.metrics['rollback_time'] = time.perf_counter() - started
+                self.connection.close()
+        finally:
+            if self.metrics_sink is not None and self.metrics:
+                self.metrics_sink(self.metrics)
         
         # Return False to propagate any exceptions
         return False
@@ -153,7 +337,27 @@ def main():
             
             for row in results:
                 print(f"ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
+        
+        print("\n" + "=" * 50)
+        
+        # Streaming example: rows are fetched in chunks while iterating
+        print("Streaming example - All users, 2 rows per fetch:")
+        print("-" * 30)
+        
+        with ExecuteQuery('example.db', "SELECT * FROM users", stream=True, arraysize=2) as rows:
+            for row in rows:
+                print(f"ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
     
+        
+        print("\n" + "=" * 50)
+        
+        # Columnar example: aggregate the age column without building rows
+        print("Columnar example - Average age:")
+        print("-" * 30)
+        
+        with ExecuteQuery('example.db', "SELECT name, age FROM users", columnar=True) as columns:
+            ages = columns['age']
+            print(f"Users: {len(ages)}, average age: {sum(ages) / len(ages):.1f}")
     except sqlite3.Error as e:
         print(f"Database error: {e}")
     except Exception as e:
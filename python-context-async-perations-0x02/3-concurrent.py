@@ -4,19 +4,343 @@ Concurrent Asynchronous Database Queries using asyncio and aiosqlite
 """
 
 import asyncio
+import time
 import aiosqlite
 import sqlite3
+from collections import namedtuple
 
+QueryResult = namedtuple('QueryResult', ['name', 'rows', 'error', 'latency'])
 
-async def async_fetch_users():
+# SQLite VM instructions between checks of a connection's abort flag
+ABORT_CHECK_STEPS = 1000
+
+
+async def _watch_abort_flag(db):
+    """
+    Install a progress handler that aborts db's statements while the
+    returned flag is set. Unlike interrupt(), this also stops a statement
+    that only starts running after the caller gave up.
+
+    Returns:
+        list: One-element flag; set flag[0] = True to abort
+    """
+    flag = [False]
+    await db.set_progress_handler(lambda: flag[0], ABORT_CHECK_STEPS)
+    return flag
+
+
+class AsyncConnectionPool:
+    """
+    A bounded pool of long-lived aiosqlite connections to one database.
+    Each aiosqlite connection owns a background thread, so reusing them
+    avoids starting a thread per query.
+    """
+
+    def __init__(self, database_name, max_size=5, acquire_timeout=None, **pragmas):
+        """
+        Initialize the pool; connections are opened lazily.
+
+        Args:
+            database_name (str): The name/path of the database file
+            max_size (int): Maximum number of open connections
+            acquire_timeout (float): Seconds acquire() waits before raising
+                asyncio.TimeoutError, None to wait forever
+            **pragmas: PRAGMA values applied to each new connection
+        """
+        self.database_name = database_name
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.pragmas = pragmas
+        self._idle = []
+        self._size = 0
+        self._abort_flags = {}  # id(connection) -> its _watch_abort_flag() flag
+        self._condition = asyncio.Condition()
+        self._closed = False
+        self.acquires = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+        self.interrupt_requests = 0
+
+    async def acquire(self, timeout=None):
+        """
+        Take a connection from the pool, opening one if below max_size.
+
+        Returns:
+            aiosqlite.Connection: A connection owned by the caller until release()
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        async with self._condition:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if not self._idle and self._size >= self.max_size:
+                self.waits += 1
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(
+                            lambda: self._closed or self._idle or self._size < self.max_size
+                        ),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    raise
+                finally:
+                    self.wait_time += time.monotonic() - started
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+            self.acquires += 1
+            if self._idle:
+                return self._idle.pop()
+            # Reserve the slot before connecting outside the lock
+            self._size += 1
+
+        db = aiosqlite.connect(self.database_name)
+        try:
+            await db
+            for name, value in self.pragmas.items():
+                await db.execute(f"PRAGMA {name} = {value}")
+            self._abort_flags[id(db)] = await _watch_abort_flag(db)
+            return db
+        except BaseException:
+            # Also runs on cancellation, or the reserved slot would be lost
+            try:
+                await db.close()
+            except BaseException:
+                pass
+            async with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    async def release(self, db):
+        """Return a healthy connection to the pool, or close it if the pool is closed."""
+        async with self._condition:
+            if not self._closed:
+                self._idle.append(db)
+                self._condition.notify()
+                return
+            self._size -= 1
+            self._abort_flags.pop(id(db), None)
+            self._condition.notify()
+        await db.close()
+
+    async def discard(self, db):
+        """Close a broken connection and free its slot for a new one."""
+        async with self._condition:
+            self._size -= 1
+            self._abort_flags.pop(id(db), None)
+            self.discarded += 1
+            self._condition.notify()
+        try:
+            await db.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """
+        Report pool usage.
+
+        Returns:
+            dict: Sizes plus acquire, wait and timeout counters
+        """
+        return {
+            'max_size': self.max_size,
+            'open': self._size,
+            'idle': len(self._idle),
+            'acquires': self.acquires,
+            'waits': self.waits,
+            'wait_time': self.wait_time,
+            'timeouts': self.timeouts,
+            'discarded': self.discarded,
+            'interrupt_requests': self.interrupt_requests,
+        }
+
+    def abort_flag(self, db):
+        """Return the flag that aborts statements on one of this pool's connections."""
+        return self._abort_flags[id(db)]
+
+    async def close(self):
+        """Close idle connections; busy ones are closed when released."""
+        async with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            for db in idle:
+                self._abort_flags.pop(id(db), None)
+            self._condition.notify_all()
+        for db in idle:
+            await db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+
+class AsyncDatabaseConnection:
+    """
+    Async context manager yielding an aiosqlite connection, either checked
+    out of an AsyncConnectionPool or opened for this block only.
+
+    Cancelling a task does not stop a statement already running in
+    aiosqlite's thread, so if the block is cancelled, times out or passes
+    its deadline, the connection's abort flag is set and the running
+    statement interrupted. The flag also aborts a statement that was still
+    queued, and is only cleared once the rollback behind it has finished,
+    so the connection goes back to the pool clean.
+    """
+
+    def __init__(self, database_name=None, pool=None, timeout=None, deadline=None):
+        """
+        Args:
+            database_name (str): Database to open when no pool is given
+            pool (AsyncConnectionPool): Pool to check the connection out of
+            timeout (float): Override of the pool's acquire timeout
+            deadline (float): Seconds after entering the block at which any
+                running statement is interrupted (it raises OperationalError)
+        """
+        self.database_name = database_name
+        self.pool = pool
+        self.timeout = timeout
+        self.deadline = deadline
+        self.db = None
+        self._abort = None
+        self._deadline_timer = None
+        self._deadline_task = None
+
+    async def __aenter__(self):
+        if self.pool is not None:
+            self.db = await self.pool.acquire(self.timeout)
+            self._abort = self.pool.abort_flag(self.db)
+        else:
+            self.db = await aiosqlite.connect(self.database_name)
+            self._abort = await _watch_abort_flag(self.db)
+        if self.deadline is not None:
+            loop = asyncio.get_running_loop()
+            self._deadline_timer = loop.call_later(self.deadline, self._on_deadline)
+        return self.db
+
+    def _on_deadline(self):
+        self._abort[0] = True
+        self._deadline_task = asyncio.get_running_loop().create_task(self._interrupt())
+
+    async def _interrupt(self):
+        # aiosqlite runs interrupt() directly rather than queueing it behind
+        # the running statement, but it is a no-op if that statement has not
+        # started yet; the abort flag catches that case. SQLite cannot tell us
+        # whether a statement was actually running, so the pool counts
+        # requests, not stopped queries.
+        self._abort[0] = True
+        if self.pool is not None:
+            self.pool.interrupt_requests += 1
+        await self.db.interrupt()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._deadline_timer is not None:
+            self._deadline_timer.cancel()
+            self._deadline_timer = None
+        if self._deadline_task is not None:
+            # Never let a late interrupt reach the connection's next borrower
+            if exc_type is None:
+                self._deadline_task.cancel()
+            await asyncio.gather(self._deadline_task, return_exceptions=True)
+            self._deadline_task = None
+        if exc_type is not None and issubclass(exc_type, (asyncio.CancelledError, asyncio.TimeoutError)):
+            await self._interrupt()
+        try:
+            if exc_type is None:
+                self._abort[0] = False
+                await self.db.commit()
+            else:
+                # Queued behind any aborted statement, so once it returns
+                # nothing of this block is left running
+                await self.db.rollback()
+                self._abort[0] = False
+        except Exception:
+            if self.pool is not None:
+                await self.pool.discard(self.db)
+            else:
+                await self.db.close()
+            raise
+        if self.pool is not None:
+            await self.pool.release(self.db)
+        else:
+            await self.db.close()
+        return False
+
+
+class ReadWritePool:
+    """
+    Read-scaling setup for SQLite in WAL mode: a pool of read-only
+    connections that run in parallel, and a single writer connection so
+    writes never contend with each other for the database lock.
+    """
+
+    def __init__(self, database_name, readers=4, acquire_timeout=None):
+        """
+        Args:
+            database_name (str): The name/path of the database file
+            readers (int): Number of parallel read connections
+            acquire_timeout (float): Seconds to wait for a free connection
+        """
+        self.database_name = database_name
+        self.writers = AsyncConnectionPool(
+            database_name, max_size=1, acquire_timeout=acquire_timeout,
+            journal_mode='WAL', synchronous='NORMAL', busy_timeout=5000
+        )
+        self.readers = AsyncConnectionPool(
+            database_name, max_size=readers, acquire_timeout=acquire_timeout,
+            query_only=1, busy_timeout=5000
+        )
+
+    async def open(self):
+        """Switch the database to WAL before any reader connects."""
+        async with self.writer():
+            pass
+        return self
+
+    def reader(self):
+        """Async context manager yielding one of the read connections."""
+        return AsyncDatabaseConnection(pool=self.readers)
+
+    def writer(self):
+        """Async context manager yielding the single writer connection."""
+        return AsyncDatabaseConnection(pool=self.writers)
+
+    def stats(self):
+        """Return pool statistics for both sides."""
+        return {'readers': self.readers.stats(), 'writer': self.writers.stats()}
+
+    async def close(self):
+        """Close every idle connection."""
+        await self.readers.close()
+        await self.writers.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+
+async def async_fetch_users(pool=None):
     """
     Asynchronously fetch all users from the database.
     
+    Args:
+        pool (AsyncConnectionPool): Pool to borrow a connection from (optional)
+    
     Returns:
         list: List of all users in the database
     """
     try:
-        async with aiosqlite.connect('example.db') as db:
+        async with AsyncDatabaseConnection('example.db', pool=pool) as db:
             cursor = await db.execute("SELECT * FROM users")
             results = await cursor.fetchall()
             print("async_fetch_users() - Fetching all users:")
@@ -28,15 +352,18 @@ async def async_fetch_users():
         return []
 
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(pool=None):
     """
     Asynchronously fetch users older than 40 from the database.
     
+    Args:
+        pool (AsyncConnectionPool): Pool to borrow a connection from (optional)
+    
     Returns:
         list: List of users older than 40
     """
     try:
-        async with aiosqlite.connect('example.db') as db:
+        async with AsyncDatabaseConnection('example.db', pool=pool) as db:
             cursor = await db.execute("SELECT * FROM users WHERE age > ?", (40,))
             results = await cursor.fetchall()
             print("async_fetch_older_users() - Fetching users older than 40:")
@@ -50,7 +377,8 @@ async def async_fetch_older_users():
 
 async def fetch_concurrently():
     """
-    Execute both queries concurrently using asyncio.gather().
+    Execute both queries concurrently using asyncio.gather(), sharing a
+    pool of long-lived connections.
     
     Returns:
         tuple: Results from both queries
@@ -60,10 +388,11 @@ async def fetch_concurrently():
     
     # Use asyncio.gather to run both queries concurrently
     try:
-        all_users, older_users = await asyncio.gather(
-            async_fetch_users(),
-            async_fetch_older_users()
-        )
+        async with AsyncConnectionPool('example.db', max_size=2) as pool:
+            all_users, older_users = await asyncio.gather(
+                async_fetch_users(pool),
+                async_fetch_older_users(pool)
+            )
         
         print("=" * 50)
         print("Concurrent queries completed successfully!")
@@ -77,6 +406,68 @@ async def fetch_concurrently():
         return [], []
 
 
+async def iter_queries(queries, pool, concurrency=4, timeout=None, timeouts=None):
+    """
+    Run named queries with at most `concurrency` in flight, yielding each
+    result as soon as it completes.
+    
+    Args:
+        queries (dict): Query name -> SQL string or (SQL, parameters) tuple
+        pool (AsyncConnectionPool): Pool the queries borrow connections from
+        concurrency (int): Maximum number of queries running at once
+        timeout (float): Default deadline in seconds for each query, counted
+            from when it starts running; a query past its deadline is
+            interrupted inside SQLite, not just abandoned
+        timeouts (dict): Per-query deadlines overriding `timeout`
+    
+    Yields:
+        QueryResult: name, rows (None on failure), error (None on success)
+        and latency in seconds; a missed deadline gives asyncio.TimeoutError
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    timeouts = timeouts or {}
+
+    async def fetch(sql, parameters):
+        async with AsyncDatabaseConnection(pool=pool) as db:
+            cursor = await db.execute(sql, parameters)
+            return await cursor.fetchall()
+
+    async def run(name, query):
+        sql, parameters = (query, ()) if isinstance(query, str) else query
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                rows = await asyncio.wait_for(fetch(sql, parameters), timeouts.get(name, timeout))
+                return QueryResult(name, rows, None, time.perf_counter() - started)
+            except Exception as e:
+                # One failing query must not take down the rest
+                return QueryResult(name, None, e, time.perf_counter() - started)
+
+    tasks = [asyncio.create_task(run(name, query)) for name, query in queries.items()]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Stop outstanding queries if the caller stops iterating early, and
+        # wait for them so their connections are back before the pool closes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_queries(queries, pool, concurrency=4, timeout=None, timeouts=None):
+    """
+    Run named queries like iter_queries() and collect every result.
+    
+    Returns:
+        dict: Query name -> QueryResult, in the order the queries were given
+    """
+    results = {}
+    async for result in iter_queries(queries, pool, concurrency, timeout, timeouts):
+        results[result.name] = result
+    return {name: results[name] for name in queries}
+
+
 def setup_database():
     """
     Set up the database with sample data for testing.
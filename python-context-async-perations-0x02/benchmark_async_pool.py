@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark 1k concurrent small queries: one aiosqlite connection per query
+against a shared AsyncConnectionPool.
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+concurrent = __import__('3-concurrent')
+
+
+def create_database(path, rows=1000):
+    """Create a users table with the given number of rows."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, email TEXT)")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                     ((i, f"user{i}", 18 + i % 60, f"user{i}@email.com") for i in range(1, rows + 1)))
+    conn.commit()
+    conn.close()
+
+
+async def point_query(user_id, database=None, pool=None):
+    """Fetch one user through AsyncDatabaseConnection."""
+    async with concurrent.AsyncDatabaseConnection(database, pool=pool) as db:
+        cursor = await db.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        return await cursor.fetchone()
+
+
+async def run_unpooled(database, queries):
+    """Open a fresh connection for every query."""
+    await asyncio.gather(*(point_query(i % 1000 + 1, database=database) for i in range(queries)))
+
+
+async def run_pooled(database, queries, max_size):
+    """Share a bounded pool between all queries."""
+    async with concurrent.AsyncConnectionPool(database, max_size=max_size) as pool:
+        await asyncio.gather(*(point_query(i % 1000 + 1, pool=pool) for i in range(queries)))
+        return pool.stats()
+
+
+def main():
+    """Print wall time and throughput for both modes."""
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    max_size = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        create_database(database)
+
+        start = time.perf_counter()
+        asyncio.run(run_unpooled(database, queries))
+        unpooled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = asyncio.run(run_pooled(database, queries, max_size))
+        pooled = time.perf_counter() - start
+
+    print(f"{queries} concurrent point queries")
+    print(f"connect per query : {unpooled:.3f}s ({queries / unpooled:.0f} queries/s)")
+    print(f"pool of {max_size:<10}: {pooled:.3f}s ({queries / pooled:.0f} queries/s)")
+    print(f"pool stats        : {stats}")
+
+
+if __name__ == "__main__":
+    main()
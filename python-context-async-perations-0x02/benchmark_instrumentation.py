@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the instrumentation overhead in DatabaseConnection and
+ExecuteQuery: no sink, a callback, a HistogramSink and a disabled
+LoggingSink, on a trivial query against :memory:, compared with the same
+block written with raw sqlite3 calls and no instrumentation at all.
+"""
+import logging
+import sqlite3
+import sys
+import timeit
+
+database_connection = __import__('0-databaseconnection')
+execute = __import__('1-execute')
+
+
+def use_raw_sqlite(sink):
+    """Uninstrumented baseline: connect, execute, commit and close by hand."""
+    connection = sqlite3.connect(':memory:')
+    cursor = connection.cursor()
+    cursor.execute("SELECT 1").fetchall()
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+def use_connection(sink):
+    """One DatabaseConnection block running SELECT 1."""
+    with database_connection.DatabaseConnection(':memory:', metrics_sink=sink) as cursor:
+        cursor.execute("SELECT 1").fetchall()
+
+
+def use_execute(sink):
+    """One ExecuteQuery block running SELECT 1."""
+    with execute.ExecuteQuery(':memory:', "SELECT 1", metrics_sink=sink) as rows:
+        len(rows)
+
+
+def main():
+    """Print microseconds per block for every sink and the overhead over raw sqlite3."""
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    collected = []
+    histogram = database_connection.HistogramSink()
+    quiet_logger = logging.getLogger("benchmark.quiet")
+    quiet_logger.setLevel(logging.WARNING)
+
+    sinks = [
+        ("no sink", None),
+        ("callback", collected.append),
+        ("histogram", histogram),
+        ("logging (off)", database_connection.LoggingSink(quiet_logger, logging.INFO)),
+    ]
+    baseline = min(timeit.repeat(lambda: use_raw_sqlite(None), number=number, repeat=5)) / number * 1e6
+    print(f"raw sqlite3 baseline: {baseline:.2f} us per block")
+    print(f"{'sink':<16}{'DatabaseConnection us':>24}{'ExecuteQuery us':>18}{'overhead us':>16}")
+    for name, sink in sinks:
+        timings = []
+        for block in (use_connection, use_execute):
+            seconds = min(timeit.repeat(lambda: block(sink), number=number, repeat=5))
+            timings.append(seconds / number * 1e6)
+        overhead = f"+{timings[0] - baseline:.2f}/+{timings[1] - baseline:.2f}"
+        print(f"{name:<16}{timings[0]:>24.2f}{timings[1]:>18.2f}{overhead:>16}")
+    print(f"histogram summary: {histogram.summary()['body_time']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare engines for running many read queries whose rows need CPU-heavy
+post-processing: aiosqlite readers over WAL, a ThreadPoolExecutor over
+plain sqlite3, and a ProcessPoolExecutor.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+concurrent = __import__('3-concurrent')
+
+QUERY = "SELECT * FROM users WHERE age BETWEEN ? AND ?"
+_local = threading.local()
+
+
+def create_database(path, rows):
+    """Create a WAL-mode users table with the given number of rows."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, email TEXT)")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                     ((i, f"user{i}", 18 + i % 60, f"user{i}@email.com") for i in range(1, rows + 1)))
+    conn.commit()
+    conn.close()
+
+
+def post_process(rows, rounds):
+    """Stand-in for CPU-heavy per-row work: repeatedly hash every row."""
+    digest = b""
+    for row in rows:
+        data = repr(row).encode()
+        for _ in range(rounds):
+            digest = hashlib.sha256(digest + data).digest()
+    return digest.hex()[:8]
+
+
+def query_and_process(database, low, rounds):
+    """Run one range query on this thread's (or process's) own connection."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = sqlite3.connect(database)
+    rows = conn.execute(QUERY, (low, low + 5)).fetchall()
+    return post_process(rows, rounds)
+
+
+async def run_aiosqlite(database, ranges, rounds, workers):
+    """Fetch on parallel WAL readers and post-process on the event loop."""
+    async with concurrent.ReadWritePool(database, readers=workers) as pool:
+        async def one(low):
+            async with pool.reader() as db:
+                cursor = await db.execute(QUERY, (low, low + 5))
+                rows = await cursor.fetchall()
+            return post_process(rows, rounds)
+        return await asyncio.gather(*(one(low) for low in ranges))
+
+
+def run_executor(executor_class, database, ranges, rounds, workers):
+    """Fetch and post-process inside the executor's workers."""
+    with executor_class(max_workers=workers) as executor:
+        return list(executor.map(query_and_process, [database] * len(ranges), ranges, [rounds] * len(ranges)))
+
+
+def main():
+    """Print wall time for each engine on the same workload."""
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 4
+    ranges = [18 + i % 55 for i in range(queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        create_database(database, rows=20000)
+
+        engines = [
+            ("aiosqlite readers", lambda: asyncio.run(run_aiosqlite(database, ranges, rounds, workers))),
+            ("thread pool", lambda: run_executor(ThreadPoolExecutor, database, ranges, rounds, workers)),
+            ("process pool", lambda: run_executor(ProcessPoolExecutor, database, ranges, rounds, workers)),
+        ]
+        print(f"{queries} range queries, {rounds} hash rounds per row, {workers} workers")
+        for name, run in engines:
+            start = time.perf_counter()
+            run()
+            print(f"{name:<18}: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,5 +32,6 @@ def fetch_all_users(query):
     conn.close()
     return results
 
-# Fetch users while logging the query
-users = fetch_all_users(query="SELECT * FROM users")
+if __name__ == "__main__":
+    # Fetch users while logging the query
+    users = fetch_all_users(query="SELECT * FROM users")
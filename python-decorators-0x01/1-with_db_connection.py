@@ -1,20 +1,219 @@
 import sqlite3 
+import asyncio
 import functools
+import threading
+
+# Named PRAGMA sets applied to a connection right after it is opened
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # Negative values are KiB, so ~64MB
+        'mmap_size': 268435456,  # 256MB of memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # Milliseconds
+    },
+}
+
+# PRAGMA names accepted as overrides: everything the profiles set, plus a few
+# other documented connection settings. SQLite silently ignores unknown
+# pragmas, so a misspelt override would otherwise be a no-op.
+ALLOWED_PRAGMAS = frozenset(
+    name for settings in SQLITE_PROFILES.values() for name in settings
+) | {
+    'auto_vacuum', 'automatic_index', 'cache_spill', 'foreign_keys',
+    'journal_size_limit', 'locking_mode', 'page_size', 'query_only',
+    'threads', 'wal_autocheckpoint',
+}
+
+
+def apply_sqlite_profile(conn, profile='default', **pragmas):
+    """Apply a named SQLITE_PROFILES entry, plus any PRAGMA overrides, to conn
+
+    Raises ValueError for an override that is not in ALLOWED_PRAGMAS.
+    """
+    unknown = sorted(set(pragmas) - ALLOWED_PRAGMAS)
+    if unknown:
+        raise ValueError(f"Unknown SQLite PRAGMA: {', '.join(unknown)}")
+    settings = dict(SQLITE_PROFILES[profile], **pragmas)
+    for name, value in settings.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def with_db_connection(func=None, *, database='users.db', profile='default', **pragmas):
+    """Decorator that automatically handles database connection opening and closing
+
+    Used bare it opens users.db with SQLite defaults; called with options it
+    can pick another database and a tuning profile (with PRAGMA overrides such
+    as cache_size) for that call site.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Open database connection
+            conn = sqlite3.connect(database)
+            try:
+                apply_sqlite_profile(conn, profile, **pragmas)
+                # Call the original function with connection as first argument
+                result = func(conn, *args, **kwargs)
+                return result
+            finally:
+                # Always close the connection
+                conn.close()
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+class _Batch:
+    """Keys collected by concurrent threads for one batch call"""
+
+    def __init__(self):
+        self.keys = {}  # Ordered set; duplicate keys share one slot
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class BatchLoader:
+    """
+    Collects point lookups made within a short window and resolves them with
+    a single call to batch_fn, which takes a list of unique keys and returns a
+    dict mapping each key to its row (missing keys resolve to None).
+
+    Threads call load() (or the loader itself); coroutines await aload().
+    load_many() and aload_many() put a whole list of keys into one batch,
+    for code that would otherwise loop over IDs. A thread with no other
+    lookup in flight dispatches at once instead of waiting out the window.
+    """
+
+    def __init__(self, batch_fn, window=0.002, max_batch=500):
+        """
+        Args:
+            batch_fn (callable): Resolves a list of keys to a {key: row} dict
+            window (float): Seconds to wait for more keys; 0 means one
+                event loop tick for aload()
+            max_batch (int): Dispatch early once this many keys are queued
+        """
+        functools.update_wrapper(self, batch_fn)
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._batch = None
+        self._active = 0  # Threads inside load_many()
+        self._async_batches = {}  # event loop -> ({key: future}, timer)
+
+    def __call__(self, key):
+        return self.load(key)
+
+    def load(self, key):
+        """Return the row for key, batched with other threads' lookups"""
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        """Return the rows for keys, in order, batched with other threads' lookups"""
+        keys = list(keys)
+        batches = []  # The batch each key went into
+        led = []  # Batches this caller opened and must run
+        with self._lock:
+            self._active += 1
+            for key in keys:
+                batch = self._batch
+                if batch is None:
+                    batch = self._batch = _Batch()
+                    led.append(batch)
+                batch.keys[key] = None
+                batches.append(batch)
+                if len(batch.keys) >= self.max_batch:
+                    self._batch = None
+                    batch.full.set()
+            # Nobody else is looking anything up, so nobody can join the batch
+            solo = self._active == 1
 
-def with_db_connection(func):
-    """Decorator that automatically handles database connection opening and closing"""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        # Open database connection
-        conn = sqlite3.connect('users.db')
         try:
-            # Call the original function with connection as first argument
-            result = func(conn, *args, **kwargs)
-            return result
+            for batch in led:
+                # The first caller waits out the window, then runs the batch
+                if not solo:
+                    batch.full.wait(self.window)
+                with self._lock:
+                    if self._batch is batch:
+                        self._batch = None
+                try:
+                    batch.results = self.batch_fn(list(batch.keys))
+                except Exception as e:
+                    batch.error = e
+                finally:
+                    batch.done.set()
+
+            rows = []
+            for key, batch in zip(keys, batches):
+                batch.done.wait()
+                if batch.error is not None:
+                    raise batch.error
+                rows.append(batch.results.get(key))
+            return rows
         finally:
-            # Always close the connection
-            conn.close()
-    return wrapper
+            with self._lock:
+                self._active -= 1
+
+    async def aload(self, key):
+        """Return the row for key, batched with other coroutines' lookups"""
+        # Shield so one cancelled caller does not cancel a shared key
+        return await asyncio.shield(self._queue_async(key))
+
+    async def aload_many(self, keys):
+        """Return the rows for keys, in order, batched with other coroutines' lookups"""
+        futures = [self._queue_async(key) for key in keys]
+        return await asyncio.gather(*(asyncio.shield(future) for future in futures))
+
+    def _queue_async(self, key):
+        loop = asyncio.get_running_loop()
+        pending = self._async_batches.get(loop)
+        if pending is None:
+            if self.window:
+                timer = loop.call_later(self.window, self._flush_async, loop)
+            else:
+                timer = loop.call_soon(self._flush_async, loop)
+            pending = self._async_batches[loop] = ({}, timer)
+
+        futures, timer = pending
+        future = futures.get(key)
+        if future is None:
+            future = futures[key] = loop.create_future()
+            if len(futures) >= self.max_batch:
+                timer.cancel()
+                self._flush_async(loop)
+        return future
+
+    def _flush_async(self, loop):
+        pending = self._async_batches.pop(loop, None)
+        if pending is not None:
+            loop.create_task(self._run_async_batch(loop, pending[0]))
+
+    async def _run_async_batch(self, loop, futures):
+        # batch_fn is blocking sqlite3 code, so keep it off the event loop
+        try:
+            results = await loop.run_in_executor(None, self.batch_fn, list(futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in futures.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+
+
+def batch_loader(window=0.002, max_batch=500):
+    """Decorator that turns a {key: row} batch function into a BatchLoader"""
+    def decorator(func):
+        return BatchLoader(func, window=window, max_batch=max_batch)
+    return decorator
 
 @with_db_connection 
 def get_user_by_id(conn, user_id): 
@@ -22,6 +221,15 @@ def get_user_by_id(conn, user_id):
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,)) 
     return cursor.fetchone() 
 
-# Fetch user by ID with automatic connection handling 
-user = get_user_by_id(user_id=1)
-print(user)
+@batch_loader(window=0.002)
+@with_db_connection
+def load_user_by_id(conn, user_ids):
+    cursor = conn.cursor()
+    placeholders = ", ".join("?" for _ in user_ids)
+    cursor.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", user_ids)
+    return {row[0]: row for row in cursor.fetchall()}
+
+if __name__ == "__main__":
+    # Fetch user by ID with automatic connection handling 
+    user = get_user_by_id(user_id=1)
+    print(user)
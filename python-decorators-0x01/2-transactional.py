@@ -39,5 +39,6 @@ def update_user_email(conn, user_id, new_email):
     cursor = conn.cursor() 
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id)) 
 
-# Update user's email with automatic transaction handling 
-update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
+if __name__ == "__main__":
+    # Update user's email with automatic transaction handling 
+    update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
@@ -1,6 +1,7 @@
 import time
 import sqlite3 
 import functools
+import threading
 
 def with_db_connection(func):
     """Decorator that automatically handles database connection opening and closing"""
@@ -40,6 +41,67 @@ def retry_on_failure(retries=3, delay=2):
         return wrapper
     return decorator
 
+# Counters for retry_with_reconnect, shared by every decorated function
+reconnect_stats = {'reconnects': 0, 'failed_connects': 0, 'recovered_after_reconnect': 0, 'exhausted': 0}
+_stats_lock = threading.Lock()
+
+
+def _record(counter):
+    with _stats_lock:
+        reconnect_stats[counter] += 1
+
+
+def retry_with_reconnect(retries=3, delay=2, database='users.db', connect=None, release=None, discard=None):
+    """Decorator that retries database operations on a fresh connection
+
+    Takes the place of with_db_connection + retry_on_failure: the connection
+    that failed is discarded (closed, or evicted from a pool via discard) and
+    replaced by a new one from connect() before the next attempt.
+    """
+    if connect is None:
+        connect = lambda: sqlite3.connect(database)
+    if release is None:
+        release = lambda conn: conn.close()
+    if discard is None:
+        discard = lambda conn: conn.close()
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(retries + 1):  # +1 to include the initial attempt
+                conn = None
+                try:
+                    # Connecting is part of the attempt, so a failed
+                    # (re)connect is retried like a failed query
+                    try:
+                        conn = connect()
+                    except Exception:
+                        _record('failed_connects')
+                        raise
+                    if attempt:
+                        _record('reconnects')
+                    result = func(conn, *args, **kwargs)
+                except Exception as e:
+                    # Never reuse a connection that just failed
+                    if conn is not None:
+                        try:
+                            discard(conn)
+                        except Exception:
+                            pass
+                    if attempt == retries:
+                        print(f"All {retries + 1} attempts failed.")
+                        _record('exhausted')
+                        raise
+                    print(f"Attempt {attempt + 1} failed: {e}. Reconnecting and retrying in {delay} seconds...")
+                    time.sleep(delay)
+                else:
+                    release(conn)
+                    if attempt:
+                        _record('recovered_after_reconnect')
+                    return result
+        return wrapper
+    return decorator
+
 @with_db_connection
 @retry_on_failure(retries=3, delay=1)
 def fetch_users_with_retry(conn):
@@ -47,6 +109,18 @@ def fetch_users_with_retry(conn):
     cursor.execute("SELECT * FROM users")
     return cursor.fetchall()
 
-# Attempt to fetch users with automatic retry on failure
-users = fetch_users_with_retry()
-print(users)
+@retry_with_reconnect(retries=3, delay=1)
+def fetch_users_with_reconnect(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users")
+    return cursor.fetchall()
+
+if __name__ == "__main__":
+    # Attempt to fetch users with automatic retry on failure
+    users = fetch_users_with_retry()
+    print(users)
+
+    # Retry on a fresh connection each time
+    users = fetch_users_with_reconnect()
+    print(users)
+    print(reconnect_stats)
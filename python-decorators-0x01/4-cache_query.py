@@ -1,6 +1,11 @@
 import time
 import sqlite3 
 import functools
+import marshal
+import sys
+import threading
+import zlib
+from collections import namedtuple
 
 def with_db_connection(func):
     """Decorator that automatically handles database connection opening and closing"""
@@ -19,38 +24,235 @@ def with_db_connection(func):
 
 query_cache = {}
 
-def cache_query(func):
-    """Decorator that caches query results based on the SQL query string"""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        # Extract the query string to use as cache key
-        cache_key = None
-        
-        # Look for 'query' in kwargs
-        if 'query' in kwargs:
-            cache_key = kwargs['query']
+# Queries currently being executed, keyed like query_cache
+_in_flight = {}
+_cache_lock = threading.Lock()
+
+CacheEntry = namedtuple('CacheEntry', ['result', 'expires_at', 'stale_until'])
+
+
+def _is_fresh(entry, now):
+    """Check whether a cache entry can be served without refreshing"""
+    return entry.expires_at is None or now < entry.expires_at
+
+
+class DiskQueryCache:
+    """Second cache tier that keeps query results in a local SQLite file
+
+    Results are stored as zlib-compressed marshal blobs next to their expiry
+    times, so a restarted worker can warm up from disk instead of the database.
+    marshal is only stable within one Python version, so every row is stamped
+    with PAYLOAD_FORMAT; rows written by another version, or that fail to
+    decode, are treated as misses and deleted. Rows past their stale deadline
+    are pruned on warm start and every prune_every writes.
+    """
+
+    PAYLOAD_FORMAT = f"zlib-marshal{marshal.version}-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+    def __init__(self, path='query_cache.db', prune_every=100):
+        """
+        Args:
+            path (str): The SQLite file holding the cached results
+            prune_every (int): Writes between sweeps for expired rows
+        """
+        self.path = path
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache ("
+            "query TEXT PRIMARY KEY, expires_at REAL, stale_until REAL, "
+            "format TEXT NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _decode(self, query, expires_at, stale_until, payload_format, payload):
+        """Build a CacheEntry from a row, or delete the row and return None"""
+        if payload_format == self.PAYLOAD_FORMAT:
+            try:
+                return CacheEntry(marshal.loads(zlib.decompress(payload)), expires_at, stale_until)
+            except Exception:
+                pass
+        print(f"Dropping unreadable disk cache entry for query: {query}")
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache WHERE query = ?", (query,))
+            self._conn.commit()
+        return None
+
+    def get(self, query):
+        """Return the stored CacheEntry for a query, or None on a miss or cache fault"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT expires_at, stale_until, format, payload FROM query_cache WHERE query = ?",
+                    (query,)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._decode(query, *row)
+        except sqlite3.Error as e:
+            print(f"Disk cache read failed for query {query}: {e}")
+            return None
+
+    def put(self, query, entry):
+        """Store a CacheEntry, skipping results marshal cannot encode"""
+        try:
+            payload = zlib.compress(marshal.dumps(entry.result))
+        except ValueError:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?, ?)",
+                    (query, entry.expires_at, entry.stale_until, self.PAYLOAD_FORMAT, payload)
+                )
+                self._conn.commit()
+                self._writes += 1
+                if self._writes % self.prune_every == 0:
+                    self._prune()
+        except sqlite3.Error as e:
+            print(f"Disk cache write failed for query {query}: {e}")
+
+    def _prune(self):
+        """Delete rows past their stale deadline (caller holds the lock)"""
+        self._conn.execute(
+            "DELETE FROM query_cache WHERE expires_at IS NOT NULL AND stale_until <= ?",
+            (time.time(),)
+        )
+        self._conn.commit()
+
+    def entries(self):
+        """Yield (query, CacheEntry) pairs that are still fresh or servable stale"""
+        with self._lock:
+            self._prune()
+            rows = self._conn.execute(
+                "SELECT query, expires_at, stale_until, format, payload FROM query_cache"
+            ).fetchall()
+        for row in rows:
+            entry = self._decode(*row)
+            if entry is not None:
+                yield row[0], entry
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        self._conn.close()
+
+
+def warm_query_cache(disk_cache):
+    """Load the disk tier into query_cache, returning how many entries were loaded"""
+    loaded = 0
+    for query, entry in disk_cache.entries():
+        with _cache_lock:
+            query_cache.setdefault(query, entry)
+        loaded += 1
+    return loaded
+
+
+class _Flight:
+    """A running query that concurrent callers can wait on and share"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _query_from_args(args, kwargs):
+    """Extract the query string to use as cache key"""
+    # Look for 'query' in kwargs
+    if 'query' in kwargs:
+        return kwargs['query']
+    # Look for query in args (assuming it's the second argument after conn)
+    for arg in args[1:]:  # Skip the connection argument
+        if isinstance(arg, str) and any(keyword in arg.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
+            return arg
+    return None
+
+
+def cached_call(cache_key, compute, ttl=None, stale_ttl=0, disk_cache=None):
+    """Return the cached result for cache_key, calling compute() on a miss
+
+    Concurrent callers asking for the same uncached key share a single
+    compute() call. With ttl set, entries expire after ttl seconds; for a
+    further stale_ttl seconds the expired result is still served to other
+    callers while one of them refreshes it. Memory misses fall through to
+    disk_cache (a DiskQueryCache) before computing.
+    """
+    now = time.time()
+    with _cache_lock:
+        entry = query_cache.get(cache_key)
+        fresh = entry is not None and _is_fresh(entry, now)
+        stale = entry is not None and not fresh and now < entry.stale_until
+        flight = None if fresh else _in_flight.get(cache_key)
+        leader = not fresh and flight is None
+        if leader:
+            flight = _in_flight[cache_key] = _Flight()
+
+    # If we found a query and it's in cache, return cached result
+    if fresh:
+        print(f"Cache hit for query: {cache_key}")
+        return entry.result
+
+    if not leader:
+        # Another caller is already running this query
+        if stale:
+            print(f"Serving stale result while refreshing query: {cache_key}")
+            return entry.result
+        print(f"Waiting for in-flight query: {cache_key}")
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    # Execute the function and cache the result
+    try:
+        entry = disk_cache.get(cache_key) if disk_cache is not None else None
+        if entry is not None and _is_fresh(entry, time.time()):
+            print(f"Disk cache hit for query: {cache_key}")
+            result = entry.result
         else:
-            # Look for query in args (assuming it's the second argument after conn)
-            for arg in args[1:]:  # Skip the connection argument
-                if isinstance(arg, str) and any(keyword in arg.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
-                    cache_key = arg
-                    break
-        
-        # If we found a query and it's in cache, return cached result
-        if cache_key and cache_key in query_cache:
-            print(f"Cache hit for query: {cache_key}")
-            return query_cache[cache_key]
-        
-        # Execute the function and cache the result
-        result = func(*args, **kwargs)
-        
-        # Cache the result if we have a cache key
-        if cache_key:
+            result = compute()
             print(f"Caching result for query: {cache_key}")
-            query_cache[cache_key] = result
-        
-        return result
-    return wrapper
+            expires_at = None if ttl is None else time.time() + ttl
+            stale_until = expires_at + stale_ttl if expires_at is not None else None
+            entry = CacheEntry(result, expires_at, stale_until)
+            if disk_cache is not None:
+                disk_cache.put(cache_key, entry)
+    except Exception as e:
+        flight.error = e
+        raise
+    else:
+        flight.result = result
+        with _cache_lock:
+            query_cache[cache_key] = entry
+    finally:
+        with _cache_lock:
+            del _in_flight[cache_key]
+        flight.done.set()
+
+    return result
+
+
+def cache_query(func=None, *, ttl=None, stale_ttl=0, disk_cache=None):
+    """Decorator that caches query results based on the SQL query string
+
+    See cached_call() for the single-flight, stale-while-revalidate and
+    disk tier behaviour.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = _query_from_args(args, kwargs)
+            if not cache_key:
+                return func(*args, **kwargs)
+            return cached_call(cache_key, lambda: func(*args, **kwargs),
+                               ttl=ttl, stale_ttl=stale_ttl, disk_cache=disk_cache)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 @with_db_connection
 @cache_query
@@ -59,8 +261,9 @@ def fetch_users_with_cache(conn, query):
     cursor.execute(query)
     return cursor.fetchall()
 
-# First call will cache the result
-users = fetch_users_with_cache(query="SELECT * FROM users")
+if __name__ == "__main__":
+    # First call will cache the result
+    users = fetch_users_with_cache(query="SELECT * FROM users")
 
-# Second call will use the cached result
-users_again = fetch_users_with_cache(query="SELECT * FROM users")
+    # Second call will use the cached result
+    users_again = fetch_users_with_cache(query="SELECT * FROM users")
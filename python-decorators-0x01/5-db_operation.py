@@ -0,0 +1,112 @@
+import time
+import sqlite3
+import functools
+from datetime import datetime
+
+with_db = __import__('1-with_db_connection')
+cache = __import__('4-cache_query')
+
+
+def _query_from_args(args, kwargs):
+    """Extract the SQL query from the caller's arguments (no conn argument yet)"""
+    if 'query' in kwargs:
+        return kwargs['query']
+    for arg in args:
+        if isinstance(arg, str) and any(keyword in arg.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
+            return arg
+    return None
+
+
+def _log_query(query):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] Executing SQL Query: {query}")
+
+
+def db_operation(database='users.db', profile='default', log=False, cache_results=False,
+                 ttl=None, stale_ttl=0, disk_cache=None, retries=0, delay=2,
+                 transactional=False, **pragmas):
+    """Single decorator combining with_db_connection, transactional,
+    retry_on_failure, log_queries and cache_query
+
+    Builds one wrapper plus one helper frame for the database work instead of
+    five stacked wrappers, picking at decoration time only the steps that are
+    enabled. Every attempt opens its own connection, so a retry never reuses
+    the one that just failed. Caching goes through cache_query's
+    cached_call(), so it shares query_cache, single-flight and stale_ttl
+    handling with cache_query, and a cache hit never opens a connection.
+    """
+    def decorator(func):
+        # Closing the connection without a commit also rolls back whatever
+        # a failed attempt wrote
+        if transactional:
+            def attempt(args, kwargs):
+                conn = sqlite3.connect(database)
+                try:
+                    with_db.apply_sqlite_profile(conn, profile, **pragmas)
+                    result = func(conn, *args, **kwargs)
+                    conn.commit()
+                    return result
+                finally:
+                    conn.close()
+        else:
+            def attempt(args, kwargs):
+                conn = sqlite3.connect(database)
+                try:
+                    with_db.apply_sqlite_profile(conn, profile, **pragmas)
+                    return func(conn, *args, **kwargs)
+                finally:
+                    conn.close()
+
+        if retries:
+            def execute(args, kwargs):
+                for number in range(retries + 1):
+                    try:
+                        return attempt(args, kwargs)
+                    except Exception as e:
+                        if number == retries:
+                            print(f"All {retries + 1} attempts failed.")
+                            raise
+                        print(f"Attempt {number + 1} failed: {e}. Reconnecting and retrying in {delay} seconds...")
+                        time.sleep(delay)
+        else:
+            execute = attempt
+
+        if cache_results and log:
+            def wrapper(*args, **kwargs):
+                query = _query_from_args(args, kwargs)
+                if not query:
+                    return execute(args, kwargs)
+                _log_query(query)
+                return cache.cached_call(query, lambda: execute(args, kwargs), ttl=ttl,
+                                         stale_ttl=stale_ttl, disk_cache=disk_cache)
+        elif cache_results:
+            def wrapper(*args, **kwargs):
+                query = _query_from_args(args, kwargs)
+                if not query:
+                    return execute(args, kwargs)
+                return cache.cached_call(query, lambda: execute(args, kwargs), ttl=ttl,
+                                         stale_ttl=stale_ttl, disk_cache=disk_cache)
+        elif log:
+            def wrapper(*args, **kwargs):
+                query = _query_from_args(args, kwargs)
+                if query:
+                    _log_query(query)
+                return execute(args, kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                return execute(args, kwargs)
+        return functools.wraps(func)(wrapper)
+    return decorator
+
+
+@db_operation(log=True, cache_results=True, retries=3, delay=1, transactional=True)
+def fetch_users(conn, query):
+    cursor = conn.cursor()
+    cursor.execute(query)
+    return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    # First call logs, runs and caches the query; the second is served from cache
+    users = fetch_users(query="SELECT * FROM users")
+    users_again = fetch_users(query="SELECT * FROM users")
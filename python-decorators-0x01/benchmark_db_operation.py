@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of per-call overhead: the five stacked decorators against
+the fused db_operation decorator, on a no-op query against :memory:.
+"""
+import contextlib
+import io
+import sys
+import timeit
+
+log_queries = __import__('0-log_queries').log_queries
+with_db = __import__('1-with_db_connection')
+transactional = __import__('2-transactional').transactional
+retry_on_failure = __import__('3-retry_on_failure').retry_on_failure
+cache = __import__('4-cache_query')
+db_operation = __import__('5-db_operation').db_operation
+
+
+def build_stacked(use_cache):
+    """Return the stacked-decorator version of a no-op query."""
+    def noop(conn, query):
+        return None
+
+    func = cache.cache_query(noop) if use_cache else noop
+    return with_db.with_db_connection(database=':memory:')(
+        transactional(retry_on_failure(retries=3, delay=0)(log_queries(func)))
+    )
+
+
+def build_fused(use_cache):
+    """Return the db_operation version of a no-op query."""
+    @db_operation(database=':memory:', log=True, cache_results=use_cache,
+                  retries=3, delay=0, transactional=True)
+    def noop(conn, query):
+        return None
+    return noop
+
+
+def measure(func, query, number):
+    """Return microseconds per call, with the decorators' prints discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(query=query)  # Warm up (and fill the cache when enabled)
+        seconds = min(timeit.repeat(lambda: func(query=query), number=number, repeat=5))
+    return seconds / number * 1e6
+
+
+def main():
+    """Print per-call overhead with caching off and on."""
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print(f"{'scenario':<12}{'stacked us':>12}{'fused us':>12}")
+    for use_cache in (False, True):
+        query = f"SELECT {int(use_cache)} -- no-op"
+        cache.query_cache.clear()
+        stacked = measure(build_stacked(use_cache), query, number)
+        cache.query_cache.clear()
+        fused = measure(build_fused(use_cache), query, number)
+        scenario = "cached" if use_cache else "uncached"
+        print(f"{scenario:<12}{stacked:>12.2f}{fused:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
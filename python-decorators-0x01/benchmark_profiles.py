@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark read/write throughput of with_db_connection under each
+SQLite tuning profile.
+"""
+import os
+import sys
+import tempfile
+import time
+
+with_db = __import__('1-with_db_connection')
+
+
+def run_profile(database, profile, writes, reads):
+    """
+    Time single-row write transactions and point reads for one profile.
+
+    Returns:
+        tuple: (writes per second, reads per second)
+    """
+    @with_db.with_db_connection(database=database, profile=profile)
+    def setup(conn):
+        conn.execute("DROP TABLE IF EXISTS users")
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+        conn.commit()
+
+    @with_db.with_db_connection(database=database, profile=profile)
+    def write_users(conn):
+        for user_id in range(1, writes + 1):
+            conn.execute("INSERT INTO users VALUES (?, ?, ?)",
+                         (user_id, f"user{user_id}", f"user{user_id}@email.com"))
+            conn.commit()  # One transaction per write, like a web request
+
+    @with_db.with_db_connection(database=database, profile=profile)
+    def read_users(conn):
+        for i in range(reads):
+            conn.execute("SELECT * FROM users WHERE id = ?", (i % writes + 1,)).fetchone()
+
+    setup()
+    start = time.perf_counter()
+    write_users()
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    read_users()
+    read_time = time.perf_counter() - start
+    return writes / write_time, reads / read_time
+
+
+def main():
+    """Print throughput for every profile in SQLITE_PROFILES."""
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    print(f"{'profile':<14}{'writes/s':>12}{'reads/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in with_db.SQLITE_PROFILES:
+            database = os.path.join(tmp, f"{profile}.db")
+            write_rate, read_rate = run_profile(database, profile, writes, reads)
+            print(f"{profile:<14}{write_rate:>12.0f}{read_rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()